@@ -1,74 +1,430 @@
 import sys
+import atexit
 import subprocess
 import os
+import posixpath
+import codecs
+import functools
+import re
+import shlex
+import socket
+import threading
+from collections import OrderedDict, deque
+from pathlib import Path
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton,
-    QTextEdit, QLabel, QComboBox, QFileDialog, QMessageBox, QInputDialog, QListWidget
+    QTextEdit, QLabel, QComboBox, QFileDialog, QMessageBox, QInputDialog, QListWidget, QProgressBar
 )
-from PySide6.QtCore import QThread, Signal
+from PySide6.QtCore import QObject, QProcess, QThread, QTimer, Signal
+from PySide6.QtGui import QTextCursor
 from qt_material import apply_stylesheet
 
+# adb 与 fastboot 位于程序目录下的 adb 子目录，只在导入时计算一次
+_HERE = os.path.dirname(os.path.abspath(__file__))
+ADB_PATH = os.path.join(_HERE, 'adb', 'adb.exe')
+FASTBOOT_PATH = os.path.join(_HERE, 'adb', 'fastboot.exe')
 
-class ADBCommandThread(QThread):
-    """用于在后台执行ADB命令的线程"""
-    command_output = Signal(str)  # 用于发送命令执行结果的信号
+# adb server 监听的端口，与 adb 一样支持通过 ANDROID_ADB_SERVER_PORT 修改
+ADB_SERVER_PORT = int(os.environ.get('ANDROID_ADB_SERVER_PORT', 5037))
 
-    def __init__(self, command):
-        super().__init__()
-        self.command = command
+# 文件管理器缓存的目录数
+LISTING_CACHE_SIZE = 32
 
-    def run(self):
+# 输出框最多保留的行数
+OUTPUT_MAX_BLOCKS = 2000
+
+# Windows 下启动 adb/fastboot 时不分配控制台窗口，其他平台为 0
+CREATE_NO_WINDOW = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+
+
+def split_command(command):
+    """
+    将命令字符串拆分为参数列表
+    反斜杠不作为转义符，以兼容 Windows 路径
+    :param command: 命令字符串
+    :return: 参数列表
+    """
+    lexer = shlex.shlex(command, posix=True)
+    lexer.whitespace_split = True
+    lexer.escape = ''
+    lexer.commenters = ''  # URL 片段、路径中的 # 不是注释
+    return list(lexer)
+
+
+def check_tool_paths():
+    """检查 adb 与 fastboot 是否存在，缺失时抛出 FileNotFoundError"""
+    for path in (ADB_PATH, FASTBOOT_PATH):
         try:
-            # 使用相对路径
-            adb_path = os.path.join(os.path.dirname(__file__), 'adb', 'adb.exe')  # 假设 adb.exe 在 adb 子目录
-            result = subprocess.run(
-                f"{adb_path} {self.command}",
-                shell=True,
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                encoding='utf-8',  # 显式指定编码为 utf-8
-                errors='ignore'    # 忽略无法解码的字符
-            )
-            self.command_output.emit(result.stdout)  # 发送命令输出
-        except Exception as e:
-            self.command_output.emit(f"执行命令时出错: {str(e)}")
+            os.stat(path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"找不到 {path}，请确认程序目录下的 adb 文件夹完整") from None
 
 
-class FastbootCommandThread(QThread):
-    """用于在后台执行Fastboot命令的线程"""
+class CommandRunner(QObject):
+    """用 QProcess 在 Qt 事件循环中执行 adb/fastboot 命令，等待子进程时不占用任何线程"""
     command_output = Signal(str)  # 用于发送命令执行结果的信号
 
-    def __init__(self, command):
+    def __init__(self, exe, max_running=1, parent=None):
+        """
+        :param exe: 可执行文件路径（ADB_PATH 或 FASTBOOT_PATH）
+        :param max_running: 同时执行的命令数，为 1 时按提交顺序依次执行
+        :param parent: 父对象
+        """
+        super().__init__(parent)
+        self.exe = exe
+        self.max_running = max_running
+        self.pending = deque()  # 等待执行的命令
+        self.running = set()    # 正在执行的 QProcess
+
+    def submit(self, argv):
+        """提交一条命令的参数列表（不含可执行文件），立即返回，不会阻塞界面"""
+        self.pending.append(argv)
+        self.start_next()
+
+    def start_next(self):
+        """在并发数允许时启动排队的命令"""
+        while self.pending and len(self.running) < self.max_running:
+            argv = self.pending.popleft()
+            self.command_output.emit(f"执行命令: {' '.join(argv)}\n\n")
+
+            process = QProcess(self)
+            process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)  # 错误输出按产生顺序合并显示
+            decoder = codecs.getincrementaldecoder('utf-8')('ignore')  # 多字节字符可能被拆在两次读取之间
+            process.readyReadStandardOutput.connect(lambda p=process, d=decoder: self.on_ready_read(p, d))
+            process.finished.connect(lambda exit_code, exit_status, p=process: self.on_finished(p, exit_code))
+            process.errorOccurred.connect(lambda error, p=process: self.on_error(p, error))
+            self.running.add(process)
+            process.start(self.exe, argv)
+
+    def on_ready_read(self, process, decoder):
+        """边读边发送，长时间运行的命令（如 install）可以实时显示进度"""
+        text = decoder.decode(process.readAllStandardOutput().data()).replace('\r', '')
+        if text:
+            self.command_output.emit(text)
+
+    def on_finished(self, process, exit_code):
+        """命令结束后报告退出码并启动下一条"""
+        if process.exitStatus() != QProcess.ExitStatus.NormalExit:
+            self.command_output.emit("命令被异常终止\n")
+        elif exit_code != 0:
+            self.command_output.emit(f"命令退出码: {exit_code}\n")
+        self.release(process)
+
+    def on_error(self, process, error):
+        """无法启动时 finished 不会触发，需要在这里收尾"""
+        if error == QProcess.ProcessError.FailedToStart:
+            self.command_output.emit(f"执行命令时出错: {process.errorString()}\n")
+            self.release(process)
+
+    def release(self, process):
+        """回收进程对象并继续执行队列"""
+        self.running.discard(process)
+        process.deleteLater()
+        self.start_next()
+
+    def kill_all(self):
+        """丢弃排队的命令并结束正在执行的命令"""
+        self.pending.clear()
+        for process in list(self.running):
+            process.kill()
+            process.waitForFinished(1000)
+
+
+class DeviceTracker(QThread):
+    """通过 adb server 的 host:track-devices 长连接接收设备列表变化"""
+    devices_changed = Signal(list)  # 设备列表发生变化时发送已连接设备的序列号
+    tracking_failed = Signal(str)   # 无法连接 adb server 时发送错误信息
+
+    def __init__(self):
         super().__init__()
-        self.command = command
+        self.sock = None
+        self.server_started = False  # adb server 是否由本程序启动
 
     def run(self):
         try:
-            # 使用相对路径
-            fastboot_path = os.path.join(os.path.dirname(__file__), 'adb', 'fastboot.exe')  # 假设 fastboot.exe 在 adb 子目录
-            result = subprocess.run(
-                f"{fastboot_path} {self.command}",
-                shell=True,
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                encoding='utf-8',  # 显式指定编码为 utf-8
-                errors='ignore'    # 忽略无法解码的字符
+            try:
+                self.sock = socket.create_connection(('127.0.0.1', ADB_SERVER_PORT))
+            except ConnectionRefusedError:
+                self.start_server()
+                self.sock = socket.create_connection(('127.0.0.1', ADB_SERVER_PORT))
+            if self.isInterruptionRequested():
+                return  # 连接期间已调用 stop，stop 时 sock 尚未建立，无法被关闭
+            request = b'host:track-devices'
+            self.sock.sendall(b'%04x' % len(request) + request)
+            if self.recv_exactly(4) != b'OKAY':
+                raise OSError('adb server 拒绝了 track-devices 请求')
+            # 之后每次设备变化 server 都会推送一帧: 4 位十六进制长度 + adb devices 格式的列表
+            while True:
+                length = int(self.recv_exactly(4), 16)
+                payload = self.recv_exactly(length)
+                self.devices_changed.emit([serial.decode('utf-8', 'ignore') for serial in _DEVICE_RE.findall(payload)])
+        except (OSError, ValueError, subprocess.CalledProcessError) as e:
+            if not self.isInterruptionRequested():  # 主动 stop 时不提示错误
+                self.tracking_failed.emit(str(e))
+        finally:
+            if self.sock is not None:
+                self.sock.close()
+                self.sock = None
+
+    def start_server(self):
+        """
+        启动 adb server，之后所有 adb 客户端都复用它，不会在第一次执行命令时才启动
+        由本程序启动的 server 在程序退出时结束，已在运行的（如其他工具启动的）不受影响
+        """
+        subprocess.run(
+            [ADB_PATH, 'start-server'],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+            creationflags=CREATE_NO_WINDOW
+        )
+        if not self.server_started:
+            self.server_started = True
+            atexit.register(
+                subprocess.run,
+                [ADB_PATH, 'kill-server'],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                creationflags=CREATE_NO_WINDOW
             )
-            self.command_output.emit(result.stdout)  # 发送命令输出
-        except Exception as e:
-            self.command_output.emit(f"执行命令时出错: {str(e)}")
+
+    def recv_exactly(self, size):
+        """从 adb server 读取指定长度的数据"""
+        data = b''
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise OSError('与 adb server 的连接已断开')
+            data += chunk
+        return data
+
+    def stop(self):
+        """断开与 adb server 的连接，结束监听"""
+        self.requestInterruption()
+        sock = self.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
 
 
-class SeaScript:
-    def __init__(self, device=None):
+# 会话中命令结束的标记行: __SEA_EOF_<退出码>__，只匹配行尾，忽略回显的命令本身
+_SENTINEL_RE = re.compile(r'__SEA_EOF_(\d+)__\s*$')
+
+
+class PersistentAdbShell:
+    """常驻的 adb shell 会话，复用同一个 adb 进程顺序执行 shell 命令"""
+    SENTINEL = '__SEA_EOF_'
+
+    def __init__(self, device):
+        self.device = device
+        self.process = None
+        self.lock = threading.Lock()  # 保证同一时间只有一条命令在会话中执行
+
+    def start(self):
+        """启动 adb shell 子进程"""
+        self.process = subprocess.Popen(
+            [ADB_PATH, '-s', self.device, 'shell'],  # stdin 为管道时新设备不分配 PTY，旧设备的回显在 run 中过滤
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=-1,
+            encoding='utf-8',
+            errors='ignore',
+            creationflags=CREATE_NO_WINDOW
+        )
+
+    def is_alive(self):
+        """会话进程是否仍在运行"""
+        return self.process is not None and self.process.poll() is None
+
+    def run(self, command):
+        """
+        在会话中执行一条 shell 命令
+        :param command: shell 命令（不需要 adb shell 开头）
+        :return: (命令输出, 退出码)
+        """
+        with self.lock:
+            if not self.is_alive():
+                self.start()
+            try:
+                request = f"{command}; echo {self.SENTINEL}$?__"
+                self.process.stdin.write(request + '\n')
+                self.process.stdin.flush()
+                output = []
+                while True:
+                    line = self.process.stdout.readline()
+                    if not line:
+                        raise OSError('adb shell 会话已断开')
+                    if line.rstrip('\r\n') == request:
+                        continue  # 旧设备的 shell 总是分配 PTY，会回显输入的命令
+                    match = _SENTINEL_RE.search(line)
+                    if match:
+                        # 哨兵前可能还有未换行的命令输出
+                        output.append(line[:match.start()])
+                        return ''.join(output), int(match.group(1))
+                    output.append(line)
+            except (OSError, ValueError):
+                self.close()  # 读写出错时丢弃会话，下次调用时重新创建
+                raise
+
+    def close(self):
+        """结束会话"""
+        if self.process is not None:
+            try:
+                self.process.stdin.close()
+                self.process.kill()
+                self.process.wait()
+            except OSError:
+                pass
+            self.process = None
+
+
+# adb devices 输出中已连接（状态为 device）的设备行
+_DEVICE_RE = re.compile(rb'^(\S+)\s+device\s*$', re.M)
+
+# getprop 输出中的一行: [属性名]: [值]
+_PROP_RE = re.compile(r'^\[([^\]]+)\]:\s*\[(.*)\]\s*$', re.M)
+
+@functools.lru_cache(maxsize=16)
+def get_device_props(device):
+    """
+    读取设备的全部系统属性，同一设备在连接期间只查询一次
+    :param device: 设备序列号
+    :return: {属性名: 值}
+    """
+    output = subprocess.run(
+        [ADB_PATH, '-s', device, 'shell', 'getprop'],
+        capture_output=True,
+        check=True,  # 失败时抛出异常，不会被缓存
+        text=True,
+        encoding='utf-8',  # 显式指定编码为 utf-8
+        errors='ignore',   # 忽略无法解码的字符
+        creationflags=CREATE_NO_WINDOW
+    ).stdout
+    return dict(_PROP_RE.findall(output))
+
+
+# adb pull 输出中的进度: [ 42%] /sdcard/...
+_PULL_PROGRESS_RE = re.compile(rb'\[\s*(\d+)%\]')
+
+def quote_shell_argument(argument):
+    """
+    把 shell 命令的一个参数还原为远端 shell 中的写法
+    含空白的参数（原本由引号括起）重新加引号，其余原样保留，管道、重定向和 $变量 仍由远端 shell 处理，
+    与单独执行时 adb 用空格拼接参数的效果一致
+    :param argument: 本地拆分后的参数
+    :return: 远端命令中的参数
+    """
+    if not argument or any(char.isspace() for char in argument):
+        return shlex.quote(argument)
+    return argument
+
+
+def batch_shell_commands(commands):
+    """
+    将连续的 shell 命令合并为一次 adb shell 调用，其余命令保持原顺序
+    :param commands: 已拆分为参数列表的命令（可带 -s 设备 前缀）
+    :return: 合并后的参数列表
+    """
+    batched = []
+    prefix = None        # 当前这组 shell 命令的 -s 参数
+    shell_commands = []  # 当前这组中每条命令在 shell 之后的参数
+
+    def flush():
+        if len(shell_commands) == 1:
+            batched.append([*prefix, 'shell', *shell_commands[0]])  # 只有一条时保持原样
+        elif shell_commands:
+            script = '; '.join(' '.join(map(quote_shell_argument, arguments)) for arguments in shell_commands)
+            batched.append([*prefix, 'shell', script])
+        shell_commands.clear()
+
+    for argv in commands:
+        index = 2 if argv[:1] == ['-s'] else 0
+        is_shell = len(argv) > index + 1 and argv[index] == 'shell'  # 不带参数的 shell 是交互式的，不合并
+        if is_shell and argv[:index] == prefix:
+            shell_commands.append(argv[index + 1:])
+            continue
+        flush()
+        if is_shell:
+            prefix = argv[:index]
+            shell_commands.append(argv[index + 1:])
+        else:
+            prefix = None
+            batched.append(argv)
+    flush()
+    return batched
+
+
+def is_split_apk_set(file_paths):
+    """
+    判断选中的多个 APK 是否为同一应用的拆分包（base.apk + split_*.apk，位于同一目录）
+    :param file_paths: APK 文件路径列表
+    :return: 是否应使用 install-multiple 安装
+    """
+    if len(file_paths) < 2:
+        return False
+    if len({os.path.dirname(path) for path in file_paths}) != 1:
+        return False
+    names = [os.path.basename(path).lower() for path in file_paths]
+    return 'base.apk' in names and all(name == 'base.apk' or name.startswith('split_') for name in names)
+
+
+# SeaScript 变量引用 ${name}
+_VARIABLE_RE = re.compile(r'\$\{([^}]+)\}')
+
+
+class VariableMap(dict):
+    """SeaScript 变量表，供 str.format_map 使用，未定义的变量保持 ${name} 原样"""
+
+    def __missing__(self, name):
+        return '${' + name + '}'
+
+
+def compile_template(line):
+    """
+    把含 ${name} 的命令编译为 str.format 模板，之后由 C 实现的格式化一次完成替换
+    只有合法标识符的变量名会被转换，其余内容（包括花括号）按原文转义
+    :param line: 原始命令
+    :return: format 模板字符串
+    """
+    parts = []
+    last = 0
+    for match in _VARIABLE_RE.finditer(line):
+        name = match.group(1)
+        if not name.isidentifier():
+            continue  # 作为普通文本处理
+        parts.append(line[last:match.start()].replace('{', '{{').replace('}', '}}'))
+        parts.append('{' + name + '}')
+        last = match.end()
+    parts.append(line[last:].replace('{', '{{').replace('}', '}}'))
+    return ''.join(parts)
+
+
+class SeaScript(QObject):
+    echo_signal = Signal(str)  # echo 输出的文本，由界面负责显示
+    LOOP_KEYWORDS = frozenset(('device', 'echo', 'set'))  # 循环体中每次循环都要执行的关键字
+
+    def __init__(self, device=None, parent=None):
         """
         初始化SeaScript解析器
         :param device: 当前选择的设备
+        :param parent: 父对象
         """
-        self.variables = {}  # 存储变量
+        super().__init__(parent)
+        self.variables = VariableMap()  # 存储变量
+        self.templates = {}  # 命令行 -> 编译后的 format 模板
         self.device = device  # 当前选择的设备
+        self.handlers = {  # 关键字 -> 处理函数
+            'device': self._do_device,
+            'echo': self._do_echo,
+            'set': self._do_set,
+            'if': self._do_if,
+            'endif': self._do_endif,
+            'loop': self._do_loop,
+            'endloop': self._do_endloop,
+        }
 
     def parse_script(self, file_path):
         """
@@ -76,64 +432,99 @@ class SeaScript:
         :param file_path: 脚本文件路径
         :return: 解析后的命令列表
         """
-        commands = []
-        with open(file_path, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
-
-        in_loop = False
-        loop_count = 0
-        loop_commands = []
-        self.variables = {'device': self.device}  # 自动设置 device 变量
+        # 一次读入，边遍历边去掉空行和注释，后续循环只处理有效行
+        lines = Path(file_path).read_text(encoding='utf-8').splitlines()
+        lines = (line for line in map(str.strip, lines) if line and line[0] != '#')
+
+        self.commands = []
+        self.loop_count = 0
+        self.loop_commands = None  # 不为 None 时表示正在收集 loop 块中的行: (关键字, 参数, 原始行)
+        self.skip_depth = 0  # 大于 0 时正在跳过条件不满足的 if 块，值为跳过的嵌套层数
+        self.variables = VariableMap()
+        if self.device:
+            self.variables['device'] = self.device  # 自动设置 device 变量
+        # 循环中频繁使用的属性和方法先取到局部变量；skip_depth 与 loop_commands 会被处理函数修改，仍需每次读取
+        handlers = self.handlers
+        get_handler = handlers.get
+        append_command = self.commands.append
+        replace_variables = self.replace_variables
         for line in lines:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue  # 跳过注释和空行
-
-            if in_loop:
-                if line == 'endloop':
-                    for _ in range(loop_count):
-                        commands.extend(loop_commands)
-                    in_loop = False
-                    loop_commands = []
-                else:
-                    loop_commands.append(self.replace_variables(line))
+            # 每行只拆分一次为 (关键字, 参数)，按关键字查表分发
+            keyword, _, args = line.partition(' ')
+            args = args.strip()
+            if keyword == 'if' or keyword == 'endif':
+                handlers[keyword](args)  # 条件嵌套需要在跳过时也继续跟踪
                 continue
+            if self.skip_depth:
+                continue  # 条件不满足，跳过直到对应的 endif，不做任何变量替换
 
-            if line.startswith('device'):
-                self.device = line.split(' ')[1]
+            if self.loop_commands is not None and keyword != 'endloop':
+                self.loop_commands.append((keyword, args, line))
                 continue
 
-            if line.startswith('echo'):
-                self.output_display.append(line[4:].strip() + '\n')
-                print(line[4:].strip())
-                QMessageBox.information(self, 'lication', line[4:].strip())
-            if line.startswith('set'):
-                parts = line.split(' ')
-                if len(parts) >= 3:
-                    self.variables[parts[1]] = ' '.join(parts[2:])
-                continue
-
-            if line.startswith('if'):
-                condition = line[3:].strip()
-                var_name, value = condition.split('==')
-                var_name = var_name.strip()
-                value = value.strip()
-                if self.variables.get(var_name) != value:
-                    continue  # 条件不满足，跳过后续命令直到 endif
-                continue
-
-            if line == 'endif':
-                continue  # 结束条件判断
-
-            if line.startswith('loop'):
-                loop_count = int(line.split(' ')[1])
-                in_loop = True
-                continue
-
-            # 替换变量并添加到命令列表
-            commands.append(self.replace_variables(line))
-
-        return commands
+            handler = get_handler(keyword)
+            if handler is None:
+                # 替换变量并添加到命令列表
+                append_command(replace_variables(line))
+            else:
+                handler(args)
+
+        return self.commands
+
+    def _do_device(self, args):
+        """device <设备>：切换当前设备"""
+        self.device = args.split(' ')[0]
+
+    def _do_echo(self, args):
+        """echo <文本>：输出文本，通过信号交给界面显示，不阻塞解析"""
+        self.echo_signal.emit(args + '\n')
+
+    def _do_set(self, args):
+        """set <变量> <值>：设置变量"""
+        parts = args.split(' ')
+        if len(parts) >= 2:
+            self.variables[parts[0]] = ' '.join(parts[1:])
+
+    def _do_if(self, args):
+        """if <变量> == <值>：条件判断"""
+        if self.skip_depth:
+            self.skip_depth += 1  # 外层已跳过，内层无需求值，只记录嵌套层数
+            return
+        var_name, value = args.split('==')
+        var_name = var_name.strip()
+        match = _VARIABLE_RE.fullmatch(var_name)
+        if match:
+            var_name = match.group(1)  # 同时支持 if name == 值 与 if ${name} == 值
+        if self.variables.get(var_name) != value.strip():
+            self.skip_depth = 1
+
+    def _do_endif(self, args):
+        """endif：结束条件判断"""
+        if self.skip_depth:
+            self.skip_depth -= 1
+
+    def _do_loop(self, args):
+        """loop <次数>：开始收集循环块"""
+        self.loop_count = int(args.split(' ')[0])
+        self.loop_commands = []
+
+    def _do_endloop(self, args):
+        """endloop：展开循环块"""
+        if self.loop_commands is None:
+            return  # 没有对应的 loop，忽略
+        body, self.loop_commands = self.loop_commands, None
+        loop_keywords = self.LOOP_KEYWORDS
+        if not any(keyword in loop_keywords for keyword, _, _ in body):
+            # 循环体只有命令时变量不会变化，替换一次后用列表乘法展开
+            self.commands.extend([self.replace_variables(line) for _, _, line in body] * self.loop_count)
+            return
+        # 循环体中有 set 等关键字时逐次执行，每次循环的变量可能不同
+        for _ in range(self.loop_count):
+            for keyword, args, line in body:
+                if keyword in loop_keywords:
+                    self.handlers[keyword](args)
+                else:
+                    self.commands.append(self.replace_variables(line))
 
     def replace_variables(self, line):
         """
@@ -141,15 +532,35 @@ class SeaScript:
         :param line: 原始命令
         :return: 替换变量后的命令
         """
-        for var_name, var_value in self.variables.items():
-            line = line.replace(f'${{{var_name}}}', var_value)
-        return line
+        # 每行只编译一次模板，loop 等重复出现的行直接复用
+        template = self.templates.get(line)
+        if template is None:
+            template = self.templates[line] = compile_template(line)
+        return template.format_map(self.variables)
+
+
+def parse_ls_entry(entry):
+    """
+    解析 ls -F 输出的一项
+    :param entry: 带类型标记的名称，/ 为目录，@ 为符号链接，* | = 为可执行文件、管道和套接字
+    :return: (名称, 是否按目录打开)，符号链接多指向目录（如 /sdcard），按目录处理
+    """
+    marker = entry[-1]
+    if marker in '/@':
+        return entry[:-1], True
+    if marker in '*|=':
+        return entry[:-1], False
+    return entry, False
 
 
 class FileManager(QWidget):
     def __init__(self, device):
         super().__init__()
         self.device = device
+        self.listing_cache = OrderedDict()  # (设备, 目录) -> 目录内容，按最近访问排序
+        self.shell = PersistentAdbShell(device)  # 所有列目录命令共用一个 adb shell 会话
+        self.pull_process = None  # 正在执行的 adb pull
+        self.pull_output = b''
         self.initUI()
 
     def initUI(self):
@@ -164,93 +575,156 @@ class FileManager(QWidget):
 
         # 文件列表
         self.file_list = QListWidget()
+        self.file_list.setUniformItemSizes(True)  # 各项高度相同，大目录无需逐项计算尺寸
         self.file_list.itemDoubleClicked.connect(self.navigate_to)
         layout.addWidget(self.file_list)
 
-        # 返回上一级按钮
+        # 返回上一级与刷新按钮
+        button_layout = QHBoxLayout()
         self.back_button = QPushButton('返回上一级')
         self.back_button.clicked.connect(self.navigate_up)
-        layout.addWidget(self.back_button)
+        self.reload_button = QPushButton('刷新')
+        self.reload_button.clicked.connect(self.reload_file_list)
+        button_layout.addWidget(self.back_button)
+        button_layout.addWidget(self.reload_button)
+        layout.addLayout(button_layout)
+
+        # 保存文件进度，adb 不输出百分比时显示为忙碌状态
+        self.progress_bar = QProgressBar()
+        self.progress_bar.hide()
+        layout.addWidget(self.progress_bar)
 
         self.setLayout(layout)
         self.current_path = '/sdcard'
         self.refresh_file_list()
 
+    def list_directory(self, path):
+        """
+        列出目录内容，最近访问过的目录直接从缓存返回
+        :param path: 设备上的目录
+        :return: [(名称, 是否为目录)]
+        """
+        key = (self.device, path)
+        entries = self.listing_cache.get(key)
+        if entries is not None:
+            self.listing_cache.move_to_end(key)
+            return entries
+
+        # ls -F 在名称后附加类型标记，目录与文件在列出时就能区分，打开时无需再探测
+        # 会话合并了错误输出，丢弃 stderr 以免错误信息被当成文件名
+        # 路径末尾加 /，目录本身是符号链接（如 /sdcard）时列出其指向的内容而不是链接本身
+        output, exit_code = self.shell.run(f"ls -1AF {shlex.quote(path.rstrip('/') + '/')} 2>/dev/null")
+        entries = [parse_ls_entry(entry) for entry in output.splitlines() if entry]  # 确保文件名不为空
+        if exit_code == 0:  # 出错的结果不缓存
+            self.listing_cache[key] = entries
+            if len(self.listing_cache) > LISTING_CACHE_SIZE:
+                self.listing_cache.popitem(last=False)  # 淘汰最久未访问的目录
+        return entries
+
+    def reload_file_list(self):
+        """丢弃当前目录的缓存并重新列出"""
+        self.listing_cache.pop((self.device, self.current_path), None)
+        self.refresh_file_list()
+
     def refresh_file_list(self):
         """刷新文件列表"""
         self.file_list.clear()
         try:
-            adb_path = os.path.join(os.path.dirname(__file__), 'adb', 'adb.exe')
-            result = subprocess.run(
-                [adb_path, '-s', self.device, 'shell', 'ls', '-1', self.current_path],
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='ignore'
-            )
-            files = result.stdout.splitlines()
-            for file in files:
-                if file:  # 确保文件名不为空
-                    self.file_list.addItem(file)
+            # 一次性添加全部项，列表只更新一次；文件名不含 /，目录以 / 结尾即可区分
+            self.file_list.addItems([name + '/' if is_dir else name
+                                     for name, is_dir in self.list_directory(self.current_path)])
         except Exception as e:
             QMessageBox.warning(self, '错误', f"无法获取文件列表: {str(e)}")
 
     def navigate_to(self, item):
-        """导航到选定的目录或处理文件打开"""
-        selected_item = item.text()
-        new_path = self.current_path + '/' + selected_item  # 使用字符串拼接
-
-        try:
-            adb_path = os.path.join(os.path.dirname(__file__), 'adb', 'adb.exe')
-            # 使用 cat 命令检查是否为文件，并设置超时
-            try:
-                result = subprocess.run(
-                    [adb_path, '-s', self.device, 'shell', 'cat', new_path],
-                    capture_output=True,
-                    text=True,
-                    encoding='utf-8',
-                    errors='ignore',
-                    timeout=2  # 设置超时为 2 秒
-                )
-                if "cat:" in result.stdout:  # 如果是目录
-                    self.current_path = new_path
-                    self.path_label.setText(f'当前路径: {self.current_path}')
-                    self.refresh_file_list()
-                elif result.returncode == 0:  # 如果是文件
-                    self.save_file(new_path, selected_item)
-            except subprocess.TimeoutExpired:  # 如果超时，直接认为是文件
-                self.save_file(new_path, selected_item)
-        except Exception as e:
-            QMessageBox.warning(self, '错误', f"无法导航到路径: {str(e)}")
+        """导航到选定的目录或保存选定的文件"""
+        name = item.text()
+        is_dir = name.endswith('/')
+        if is_dir:
+            name = name[:-1]
+        new_path = posixpath.join(self.current_path, name)
+        if is_dir:
+            self.current_path = new_path
+            self.path_label.setText(f'当前路径: {self.current_path}')
+            self.refresh_file_list()
+        else:
+            self.save_file(new_path, name)
 
     def save_file(self, remote_path, file_name):
         """保存文件到本地"""
+        if self.pull_process is not None:
+            QMessageBox.warning(self, '提示', '正在保存其他文件，请稍后再试。')
+            return
         save_directory = QFileDialog.getExistingDirectory(self, "选择保存目录")
         if save_directory:
             save_path = os.path.join(save_directory, file_name)
-            try:
-                adb_path = os.path.join(os.path.dirname(__file__), 'adb', 'adb.exe')
-                # 使用 adb pull 命令将文件从设备复制到本地
-                subprocess.run(
-                    [adb_path, '-s', self.device, 'pull', remote_path, save_path],
-                    capture_output=True,
-                    text=True,
-                    encoding='utf-8',
-                    errors='ignore'
-                )
-                QMessageBox.information(self, '提示', f'文件已保存到: {save_path}')
-            except Exception as e:
-                QMessageBox.warning(self, '错误', f"无法保存文件: {str(e)}")
+            # 使用 adb pull 将文件从设备复制到本地，QProcess 异步执行，大文件不会卡住界面
+            process = QProcess(self)
+            process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+            process.readyReadStandardOutput.connect(self.on_pull_output)
+            process.finished.connect(lambda exit_code, exit_status: self.on_pull_finished(save_path, exit_code))
+            process.errorOccurred.connect(self.on_pull_error)
+            self.pull_process = process
+            self.pull_output = b''
+            self.progress_bar.setRange(0, 0)
+            self.progress_bar.show()
+            process.start(ADB_PATH, ['-s', self.device, 'pull', remote_path, save_path])
+
+    def on_pull_output(self):
+        """读取 adb pull 的输出并更新进度"""
+        data = self.pull_process.readAllStandardOutput().data()
+        self.pull_output += data
+        percents = _PULL_PROGRESS_RE.findall(data)
+        if percents:
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(int(percents[-1]))
+
+    def on_pull_finished(self, save_path, exit_code):
+        """adb pull 结束后提示结果"""
+        succeeded = self.pull_process.exitStatus() == QProcess.ExitStatus.NormalExit and exit_code == 0
+        self.release_pull_process()  # 先收起进度条再弹出提示
+        if succeeded:
+            QMessageBox.information(self, '提示', f'文件已保存到: {save_path}')
+        else:
+            # 进度以 \r 分隔，最后一行才是 adb 的错误信息
+            lines = self.pull_output.decode('utf-8', 'ignore').replace('\r', '\n').strip().splitlines()
+            QMessageBox.warning(self, '错误', f"无法保存文件: {lines[-1] if lines else ''}")
+
+    def on_pull_error(self, error):
+        """adb 无法启动时 finished 不会触发，需要在这里收尾"""
+        if error == QProcess.ProcessError.FailedToStart:
+            message = self.pull_process.errorString()
+            self.release_pull_process()
+            QMessageBox.warning(self, '错误', f"无法保存文件: {message}")
+
+    def release_pull_process(self):
+        """隐藏进度条并回收进程对象"""
+        self.progress_bar.hide()
+        self.pull_process.deleteLater()
+        self.pull_process = None
 
     def navigate_up(self):
         """返回上一级目录"""
         if self.current_path != '/':
-            self.current_path = '/'.join(self.current_path.split('/')[:-1])  # 直接使用字符串操作
-            if self.current_path == '':  # 如果路径为空，设置为根目录
-                self.current_path = '/'
+            self.current_path = posixpath.dirname(self.current_path) or '/'
             self.path_label.setText(f'当前路径: {self.current_path}')
             self.refresh_file_list()
 
+    def closeEvent(self, event):
+        """关闭窗口时结束 adb shell 会话"""
+        self.shell.close()
+        super().closeEvent(event)
+
+
+def requires_device(method):
+    """ADBTool 方法装饰器：未选择设备时提示并返回，否则把当前设备的 -s 参数作为第一个参数传入"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.device:
+            QMessageBox.warning(self, '错误', '请先选择一个设备！')
+            return
+        return method(self, self.device_argv, *args, **kwargs)
+    return wrapper
 
 
 class ADBTool(QWidget):
@@ -258,8 +732,18 @@ class ADBTool(QWidget):
         super().__init__()
         self.initUI()
         self.device_list = []  # 存储设备列表
-        self.current_thread = None  # 用于跟踪当前执行的线程
-        self.refresh_devices()  # 初始化时刷新设备列表
+        # adb 命令按提交顺序依次执行（每台设备只有一条传输通道），fastboot 可以同时操作多台设备
+        self.adb_runner = CommandRunner(ADB_PATH, 1, self)
+        self.adb_runner.command_output.connect(self.append_output)
+        self.fastboot_runner = CommandRunner(FASTBOOT_PATH, 4, self)
+        self.fastboot_runner.command_output.connect(self.append_output)
+        self.device = ''  # 当前选择的设备
+        self.device_argv = []  # 当前设备的 -s 参数，拼接到每条命令前
+        self.device_tracker = DeviceTracker()  # 监听设备连接与断开
+        self.device_tracker.devices_changed.connect(self.update_device_list)
+        self.device_tracker.tracking_failed.connect(
+            lambda error: self.append_output(f"刷新设备列表时出错: {error}\n"))
+        self.refresh_devices()  # 初始化时开始监听设备列表
 
     def initUI(self):
         self.setStyleSheet("font-family: Microsoft YaHei;")
@@ -278,6 +762,7 @@ class ADBTool(QWidget):
         device_layout = QHBoxLayout()
         self.device_label = QLabel('选择设备:')
         self.device_combo = QComboBox()
+        self.device_combo.currentTextChanged.connect(self.on_device_changed)
         self.refresh_button = QPushButton('刷新设备')
         self.refresh_button.clicked.connect(self.refresh_devices)
         device_layout.addWidget(self.device_label)
@@ -297,7 +782,7 @@ class ADBTool(QWidget):
         # 常用命令按钮
         command_button_layout = QHBoxLayout()
         self.reboot_button = QPushButton('重启设备')
-        self.reboot_button.clicked.connect(lambda: self.execute_adb_command('reboot'))
+        self.reboot_button.clicked.connect(lambda: self.execute_adb_command(['reboot']))
         self.screenshot_button = QPushButton('截图')
         self.screenshot_button.clicked.connect(self.take_screenshot)
         self.install_button = QPushButton('安装APK')
@@ -341,6 +826,8 @@ class ADBTool(QWidget):
         # 输出显示
         self.output_display = QTextEdit(self)
         self.output_display.setReadOnly(True)
+        self.output_display.document().setMaximumBlockCount(OUTPUT_MAX_BLOCKS)  # 限制行数，旧内容自动丢弃
+        self.output_buffer = []  # 等待写入输出框的文本
         layout.addWidget(self.output_display)
 
         # 添加 SeaScript 执行按钮
@@ -351,39 +838,62 @@ class ADBTool(QWidget):
         self.setLayout(layout)
 
     def refresh_devices(self):
-        """刷新设备列表"""
-        try:
-            adb_path = os.path.join(os.path.dirname(__file__), 'adb', 'adb.exe')  # 假设 adb.exe 在 adb 子目录
-            result = subprocess.run(
-                [adb_path, 'devices'],
-                capture_output=True,
-                text=True,
-                encoding='utf-8',  # 显式指定编码为 utf-8
-                errors='ignore'    # 忽略无法解码的字符
-            )
-            output = result.stdout
-            devices = [line.split()[0] for line in output.splitlines() if 'device' in line and not 'offline' in line and not 'List' in line]
-            self.device_list = devices
-            self.device_combo.clear()
-            self.device_combo.addItems(devices)
-            if not devices:
-                self.output_display.setText("未检测到设备，请连接设备后重试。")
-        except Exception as e:
-            self.output_display.setText(f"刷新设备列表时出错: {str(e)}")
-
-    def get_selected_device(self):
-        """获取当前选择的设备"""
-        return self.device_combo.currentText()
-
-    def execute_adb_command(self, command):
-        """执行ADB命令"""
-        device = self.get_selected_device()
-        if not device:
-            QMessageBox.warning(self, '错误', '请先选择一个设备！')
-            return
+        """刷新设备列表：设备变化由 DeviceTracker 主动推送，这里只在监听断开时重新连接"""
+        if not self.device_tracker.isRunning():
+            self.device_tracker.start()
+
+    def update_device_list(self, devices):
+        """收到 adb server 推送的设备列表后更新界面"""
+        changed = set(devices) != set(self.device_list)  # 只关心设备增减，server 推送的顺序可能变化
+        self.device_list = devices
+        if changed:
+            old_devices = [self.device_combo.itemText(i) for i in range(self.device_combo.count())]
+            get_device_props.cache_clear()  # 设备重新连接后属性可能已变化（如刷机后）
+            # 只增删变化的项，避免整体重建下拉框和丢失当前选择
+            selected = self.device_combo.currentText()
+            self.device_combo.blockSignals(True)
+            for index in reversed(range(len(old_devices))):
+                if old_devices[index] not in devices:
+                    self.device_combo.removeItem(index)
+            for device in devices:
+                if device not in old_devices:
+                    self.device_combo.addItem(device)
+            if selected in devices:
+                self.device_combo.setCurrentText(selected)
+            self.device_combo.blockSignals(False)
+            if self.device_combo.currentText() != selected:
+                self.on_device_changed(self.device_combo.currentText())
+        if not devices:
+            self.append_output("未检测到设备，请连接设备后重试。\n")
+
+    def on_device_changed(self, device):
+        """切换设备时缓存设备及其 -s 参数"""
+        self.device = device
+        self.device_argv = ['-s', device] if device else []
 
-        full_command = f"-s {device} {command}"
-        self.run_command_in_thread(full_command)
+    def append_output(self, text):
+        """
+        追加文本到输出框
+        同一轮事件循环内收到的文本先合并，再一次性插入到文档末尾，避免每条输出都重新排版
+        """
+        if not self.output_buffer:
+            QTimer.singleShot(0, self.flush_output)
+        self.output_buffer.append(text)
+
+    def flush_output(self):
+        """把合并后的文本写入输出框并滚动到底部"""
+        text = ''.join(self.output_buffer)
+        self.output_buffer.clear()
+        cursor = QTextCursor(self.output_display.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+        scroll_bar = self.output_display.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
+
+    @requires_device
+    def execute_adb_command(self, device_argv, argv):
+        """对当前设备执行ADB命令（参数列表）"""
+        self.run_adb_command(device_argv + argv)
 
     def execute_custom_command(self):
         """执行自定义命令"""
@@ -392,70 +902,53 @@ class ADBTool(QWidget):
             QMessageBox.warning(self, '错误', '请输入有效的ADB命令！')
             return
 
-        self.run_command_in_thread(command)
-
-    def run_command_in_thread(self, command):
-        """在后台线程中运行ADB命令"""
-        if self.current_thread and self.current_thread.isRunning():
-            self.current_thread.quit()  # 停止前一个线程
-            self.current_thread.wait()   # 等待线程结束
-
-        self.output_display.clear()
-        self.output_display.append(f"执行命令: {command}\n")
-
-        self.current_thread = ADBCommandThread(command)
-        self.current_thread.command_output.connect(self.output_display.append)
-        self.current_thread.start()
-
-    def run_fastboot_command(self, command):
-        """执行FASTBOOT命令"""
-        if self.current_thread and self.current_thread.isRunning():
-            self.current_thread.quit()  # 停止前一个线程
-            self.current_thread.wait()   # 等待线程结束
+        try:
+            argv = split_command(command)
+        except ValueError as e:  # 如引号不成对
+            self.append_output(f"无法解析命令: {command}（{e}）\n")
+            return
+        self.run_adb_command(argv)
 
-        self.output_display.clear()
-        self.output_display.append(f"执行命令: {command}\n")
+    def run_adb_command(self, argv):
+        """执行ADB命令（参数列表），正在执行的命令结束后才会开始"""
+        self.adb_runner.submit(argv)
 
-        self.current_thread = FastbootCommandThread(command)
-        self.current_thread.command_output.connect(self.output_display.append)
-        self.current_thread.start()
+    def run_fastboot_command(self, argv):
+        """执行FASTBOOT命令（参数列表）"""
+        self.fastboot_runner.submit(argv)
 
-    def take_screenshot(self):
+    @requires_device
+    def take_screenshot(self, device_argv):
         """截图功能"""
-        device = self.get_selected_device()
-        if not device:
-            QMessageBox.warning(self, '错误', '请先选择一个设备！')
-            return
-
         file_path, _ = QFileDialog.getSaveFileName(self, '保存截图', '', 'PNG Files (*.png)')
         if file_path:
             try:
-                adb_path = os.path.join(os.path.dirname(__file__), 'adb', 'adb.exe')  # 假设 adb.exe 在 adb 子目录
-                subprocess.run(f"{adb_path} -s {device} shell mkdir -p /sdcard/SeaADBTools/temp/screenshot", shell=True, check=True)
-                subprocess.run(f"{adb_path} -s {device} shell screencap -p /sdcard/SeaADBTools/temp/screenshot/screenshot.png", shell=True, check=True)
-                subprocess.run(f"{adb_path} -s {device} pull /sdcard/SeaADBTools/temp/screenshot/screenshot.png {file_path}", shell=True, check=True)
+                # exec-out 直接把 PNG 数据流写入本地文件，无需设备端临时文件和 pull
+                with open(file_path, 'wb') as file:
+                    subprocess.run(
+                        [ADB_PATH, *device_argv, 'exec-out', 'screencap', '-p'],
+                        stdout=file,
+                        check=True,
+                        creationflags=CREATE_NO_WINDOW
+                    )
                 QMessageBox.information(self, '提示', '截图已保存到' + file_path)
-            except subprocess.CalledProcessError:
+            except (subprocess.CalledProcessError, OSError):
+                Path(file_path).unlink(missing_ok=True)  # 不留下残缺的 PNG
                 QMessageBox.warning(self, '错误', '截图失败，请检查设备连接状态。')
 
-    def install_apk(self):
+    @requires_device
+    def install_apk(self, device_argv):
         """安装APK功能"""
-        device = self.get_selected_device()
-        if not device:
-            QMessageBox.warning(self, '错误', '请先选择一个设备！')
+        file_paths, _ = QFileDialog.getOpenFileNames(self, '选择APK文件', '', 'APK Files (*.apk)')
+        if not file_paths:
             return
 
-        file_path, _ = QFileDialog.getOpenFileName(self, '选择APK文件', '', 'APK Files (*.apk)')
-        if file_path:
-            self.run_command_in_thread(f"-s {device} install {file_path}")
-
-    def clean_sea_adb_tools_temp_files(self):
-        """清理 SeaADBTools 临时文件"""
-        try:
-            adb_path = os.path.join(os.path.dirname(__file__), 'adb', 'adb.exe')
-            subprocess.run(f"{adb_path} shell rm -rf /sdcard/SeaADBTools/temp", shell=True, check=True)
-        except subprocess.CalledProcessError:
-            QMessageBox.warning(self, '错误', '清理临时文件失败，请检查设备连接状态。')
+        if is_split_apk_set(file_paths):
+            # 同一应用的拆分 APK 必须在一次会话中一起安装
+            self.run_adb_command([*device_argv, 'install-multiple', *file_paths])
+            return
+        for file_path in file_paths:
+            self.run_adb_command([*device_argv, 'install', file_path])
 
     def run_sea_script(self):
         """执行SeaScript脚本"""
@@ -463,88 +956,50 @@ class ADBTool(QWidget):
         if not file_path:
             return
 
-        device = self.get_selected_device()  # 获取当前选择的设备
-        sea_script = SeaScript(device)  # 将设备传递给 SeaScript
+        sea_script = SeaScript(self.device)  # 将当前选择的设备传递给 SeaScript
+        sea_script.echo_signal.connect(self.append_output)
+        self.output_display.clear()
         commands = sea_script.parse_script(file_path)
 
+        # 每行只拆分一次；有命令无法解析时整个脚本都不执行，避免只执行一部分
+        argvs = []
         for command in commands:
-            self.run_command_in_thread(command)
-
-    def reboot_to_fastboot(self):
+            try:
+                argvs.append(split_command(command))
+            except ValueError as e:  # 如引号不成对
+                self.append_output(f"无法解析命令: {command}（{e}）\n")
+                return
+        # 连续的 shell 命令合并为一次 adb 调用，命令按顺序排队执行
+        for argv in batch_shell_commands(argvs):
+            self.run_adb_command(argv)
+
+    @requires_device
+    def reboot_to_fastboot(self, device_argv):
         """重启设备到FASTBOOT模式"""
-        device = self.get_selected_device()
-        if not device:
-            QMessageBox.warning(self, '错误', '请先选择一个设备！')
-            return
-
-        self.run_command_in_thread(f"-s {device} reboot-bootloader")
+        self.run_adb_command([*device_argv, 'reboot-bootloader'])
 
     def flash_image(self):
-        """刷入镜像文件"""
-        device = self.get_selected_device()
-        if not device:
-            QMessageBox.warning(self, '错误', '请先选择一个设备！')
-            return
-
+        """刷入镜像文件（设备处于 FASTBOOT 模式时不在 adb 设备列表中，无需选择设备）"""
         file_path, _ = QFileDialog.getOpenFileName(self, '选择镜像文件', '', 'Image Files (*.img)')
         if file_path:
             partition, ok = QInputDialog.getText(self, '选择分区', '请输入要刷入的分区（如 boot, recovery, system 等）：')
             if ok and partition:
-                self.run_command_in_thread(f"-s {device} flash {partition} {file_path}")
+                self.run_fastboot_command(['flash', partition, file_path])
 
     def unlock_bootloader(self):
-        """解锁Bootloader"""
-        device = self.get_selected_device()
-        if not device:
-            QMessageBox.warning(self, '错误', '请先选择一个设备！')
-            return
-
-        self.run_fastboot_command('oem unlock')
+        """解锁Bootloader（设备处于 FASTBOOT 模式时不在 adb 设备列表中，无需选择设备）"""
+        self.run_fastboot_command(['oem', 'unlock'])
 
-    def get_device_info(self):
+    @requires_device
+    def get_device_info(self, device_argv):
         """获取设备信息并格式化输出"""
-        device = self.get_selected_device()
-        if not device:
-            QMessageBox.warning(self, '错误', '请先选择一个设备！')
-            return
-
+        _, device = device_argv  # ['-s', 序列号]
         try:
-            adb_path = os.path.join(os.path.dirname(__file__), 'adb', 'adb.exe')  # 假设 adb.exe 在 adb 子目录
-            # 获取设备型号
-            model = subprocess.run(
-                [adb_path, '-s', device, 'shell', 'getprop', 'ro.product.model'],
-                capture_output=True,
-                text=True,
-                encoding='utf-8',  # 显式指定编码为 utf-8
-                errors='ignore'    # 忽略无法解码的字符
-            ).stdout.strip()
-
-            # 获取设备品牌
-            brand = subprocess.run(
-                [adb_path, '-s', device, 'shell', 'getprop', 'ro.product.brand'],
-                capture_output=True,
-                text=True,
-                encoding='utf-8',  # 显式指定编码为 utf-8
-                errors='ignore'    # 忽略无法解码的字符
-            ).stdout.strip()
-
-            # 获取设备系统版本
-            version = subprocess.run(
-                [adb_path, '-s', device, 'shell', 'getprop', 'ro.build.version.release'],
-                capture_output=True,
-                text=True,
-                encoding='utf-8',  # 显式指定编码为 utf-8
-                errors='ignore'    # 忽略无法解码的字符
-            ).stdout.strip()
-
-            # 获取设备序列号
-            serial = subprocess.run(
-                [adb_path, '-s', device, 'shell', 'getprop', 'ro.serialno'],
-                capture_output=True,
-                text=True,
-                encoding='utf-8',  # 显式指定编码为 utf-8
-                errors='ignore'    # 忽略无法解码的字符
-            ).stdout.strip()
+            props = get_device_props(device)
+            model = props.get('ro.product.model', '')
+            brand = props.get('ro.product.brand', '')
+            version = props.get('ro.build.version.release', '')
+            serial = props.get('ro.serialno', '')
 
             # 格式化输出
             info = f"""
@@ -553,17 +1008,14 @@ class ADBTool(QWidget):
 系统版本: Android {version}
 设备序列号: {serial}
             """
-            self.output_display.append(info)
+            self.append_output(info)
         except Exception as e:
-            self.output_display.append(f"获取设备信息时出错: {str(e)}")
+            self.append_output(f"获取设备信息时出错: {str(e)}\n")
 
-    def open_file_manager(self):
+    @requires_device
+    def open_file_manager(self, device_argv):
         """打开文件管理器"""
-        device = self.get_selected_device()
-        if not device:
-            QMessageBox.warning(self, '错误', '请先选择一个设备！')
-            return
-
+        _, device = device_argv  # ['-s', 序列号]
         self.file_manager_window = FileManager(device)
         self.file_manager_window.show()
 
@@ -572,6 +1024,14 @@ class ADBTool(QWidget):
         self.settings_window = Settings()  # 将主窗口作为父窗口传递
         self.settings_window.show()
 
+    def closeEvent(self, event):
+        """关闭窗口时结束排队和正在执行的命令以及设备监听"""
+        self.adb_runner.kill_all()
+        self.fastboot_runner.kill_all()
+        self.device_tracker.stop()
+        self.device_tracker.wait()
+        super().closeEvent(event)
+
 
 class Settings(QWidget):
     def __init__(self):
@@ -606,6 +1066,11 @@ class Settings(QWidget):
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    try:
+        check_tool_paths()
+    except FileNotFoundError as e:
+        QMessageBox.critical(None, '错误', str(e))
+        sys.exit(1)
     apply_stylesheet(app, theme='light_blue.xml')  # 切换主题
     ex = ADBTool()
     ex.show()